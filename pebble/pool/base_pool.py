@@ -17,6 +17,11 @@
 import time
 import logging
 
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic  # Python 2
+
 from threading import RLock
 from collections import namedtuple
 from itertools import chain, count, islice
@@ -77,10 +82,10 @@ class BasePool(object):
             self._stop_pool()
 
     def _wait_queue_depletion(self, timeout):
-        tick = time.time()
+        tick = monotonic()
 
         while self.active:
-            if timeout is not None and time.time() - tick > timeout:
+            if timeout is not None and monotonic() - tick > timeout:
                 raise TimeoutError("Tasks are still being executed")
             elif self._context.task_queue.unfinished_tasks:
                 time.sleep(SLEEP_UNIT)
@@ -138,6 +143,9 @@ class PoolContext(object):
 
 
 class Task:
+    __slots__ = ('id', 'future', 'timeout', 'payload',
+                 'timestamp', 'worker_id')
+
     def __init__(self, identifier, future, timeout, payload):
         self.id = identifier
         self.future = future
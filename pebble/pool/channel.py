@@ -41,11 +41,16 @@ class Channel(object):
         self.poll = self._make_poll_method()
 
     def _make_poll_method(self):
+        if os.name != 'nt':
+            poller = select.poll()
+            poller.register(self.reader)
+
         def unix_poll(timeout=None):
-            poll = select.poll()
-            poll.register(self.reader)
+            if timeout is not None:
+                timeout *= MILLISECONDS  # poll expects milliseconds
+
             try:
-                return bool(poll.poll(timeout))
+                return bool(poller.poll(timeout))
             except OSError:
                 raise
             except select.error as err:  # Python 2
@@ -62,9 +67,15 @@ class Channel(object):
     def recv(self):
         return self.reader.recv()
 
+    def recv_bytes(self):
+        return self.reader.recv_bytes()
+
     def send(self, obj):
         return self.writer.send(obj)
 
+    def send_bytes(self, buffer):
+        return self.writer.send_bytes(buffer)
+
     def close(self):
         self.reader.close()
         self.writer.close()
@@ -76,6 +87,7 @@ class WorkerChannel(Channel):
         self.mutex = ChannelMutex()
         self.recv = self._make_recv_method()
         self.send = self._make_send_method()
+        self.send_bytes = self._make_send_bytes_method()
 
     def __getstate__(self):
         return self.reader, self.writer, self.mutex
@@ -86,6 +98,7 @@ class WorkerChannel(Channel):
         self.poll = self._make_poll_method()
         self.recv = self._make_recv_method()
         self.send = self._make_send_method()
+        self.send_bytes = self._make_send_bytes_method()
 
     def _make_recv_method(self):
         def recv():
@@ -104,6 +117,16 @@ class WorkerChannel(Channel):
 
         return os.name != 'nt' and unix_send or windows_send
 
+    def _make_send_bytes_method(self):
+        def unix_send_bytes(buffer):
+            with self.mutex.writer:
+                return self.writer.send_bytes(buffer)
+
+        def windows_send_bytes(buffer):
+            return self.writer.send_bytes(buffer)
+
+        return os.name != 'nt' and unix_send_bytes or windows_send_bytes
+
     @property
     @contextmanager
     def lock(self):
@@ -179,3 +202,4 @@ class ChannelMutex:
 
 
 LOCK_TIMEOUT = 60
+MILLISECONDS = 1000
@@ -15,19 +15,42 @@
 # along with Pebble.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-import time
+import heapq
 import pickle
+import struct
+import types
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic  # Python 2
 
-from itertools import count
 from collections import namedtuple
 from multiprocessing import cpu_count
 from signal import SIG_IGN, SIGINT, signal
 from concurrent.futures import CancelledError, TimeoutError
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
 try:
     from concurrent.futures.process import BrokenProcessPool
 except ImportError:
     class BrokenProcessPool(OSError):
         pass
+try:
+    from multiprocessing.shared_memory import SharedMemory
+    from multiprocessing.resource_tracker import unregister
+except ImportError:  # Python < 3.8
+    SharedMemory = None
+try:
+    # functions must be serialized with the multiprocessing reducers
+    from multiprocessing.reduction import ForkingPickler
+
+    def dump_object(obj):
+        return ForkingPickler.dumps(obj).tobytes()
+except ImportError:  # Python 2 registers its reducers globally
+    dump_object = pickle.dumps
 
 from pebble.pool.channel import ChannelError, channels
 from pebble.pool.base_pool import BasePool, Task, TaskPayload
@@ -57,6 +80,9 @@ class ProcessPool(BasePool):
         super(ProcessPool, self).__init__(
             max_workers, max_tasks, initializer, initargs)
         self._pool_manager = PoolManager(self._context)
+        # Spawn the workers upfront so the first scheduled task
+        # does not pay the fork and initializer latency.
+        self._start_pool()
 
     def _start_pool(self):
         with self._context.state_mutex:
@@ -66,7 +92,7 @@ class ProcessPool(BasePool):
                                              self._pool_manager),
                                launch_thread(None, pool_manager_loop,
                                              self._pool_manager),
-                               launch_thread(None, message_manager_loop,
+                               launch_thread(None, worker_reaper_loop,
                                              self._pool_manager))
                 self._context.state = RUNNING
 
@@ -136,41 +162,65 @@ class ProcessPool(BasePool):
 
 def task_scheduler_loop(pool_manager):
     context = pool_manager.context
-    task_queue = context.task_queue
+    get_task = context.task_queue.get
+    task_done = context.task_queue.task_done
+    schedule = pool_manager.schedule
 
     try:
         while context.alive:
-            task = task_queue.get()
+            task = get_task()
 
             if task is not None:
                 if task.future.cancelled():
                     task.set_running_or_notify_cancel()
-                    task_queue.task_done()
+                    task_done()
                 else:
-                    pool_manager.schedule(task)
+                    schedule(task)
             else:
-                task_queue.task_done()
+                task_done()
     except BrokenProcessPool:
         context.state = ERROR
 
 
 def pool_manager_loop(pool_manager):
+    """Processes workers messages waking up periodically
+    to update the Pool status."""
     context = pool_manager.context
 
     try:
+        sleep_unit = SLEEP_UNIT
+        next_update = monotonic() + sleep_unit
+
         while context.alive:
-            pool_manager.update_status()
-            time.sleep(SLEEP_UNIT)
+            if (pool_manager.process_next_message(
+                    max(0.0, next_update - monotonic()))
+                    or pool_manager.task_manager.tasks):
+                # active Pool: restore the update granularity
+                # clamping any deadline stretched while idling
+                sleep_unit = SLEEP_UNIT
+                next_update = min(next_update, monotonic() + sleep_unit)
+
+            if monotonic() >= next_update:
+                pool_manager.update_status()
+
+                if not pool_manager.task_manager.tasks:
+                    # idle Pool: backoff the wakeups
+                    sleep_unit = min(sleep_unit * 2, MAX_SLEEP_UNIT)
+
+                next_update = monotonic() + sleep_unit
     except BrokenProcessPool:
         context.state = ERROR
 
 
-def message_manager_loop(pool_manager):
+def worker_reaper_loop(pool_manager):
+    """Terminates workers scheduled for removal
+    keeping the pool manager wait-free."""
     context = pool_manager.context
+    worker_manager = pool_manager.worker_manager
 
     try:
         while context.alive:
-            pool_manager.process_next_message(SLEEP_UNIT)
+            worker_manager.reap_worker(SLEEP_UNIT)
     except BrokenProcessPool:
         context.state = ERROR
 
@@ -200,15 +250,22 @@ class PoolManager:
             self.task_manager.task_problem(task.id, error)
 
     def process_next_message(self, timeout):
-        """Processes the next message coming from the workers."""
-        message = self.worker_manager.receive(timeout)
+        """Processes the messages coming from the workers.
 
-        if isinstance(message, Acknowledgement):
-            self.task_manager.task_start(message.task, message.worker)
-        elif isinstance(message, Result):
-            self.task_manager.task_done(message.task, message.result)
-        elif isinstance(message, Problem):
-            self.task_manager.task_problem(message.task, message.error)
+        Returns the amount of processed messages.
+
+        """
+        messages = self.worker_manager.receive(timeout)
+
+        for message in messages:
+            if isinstance(message, Acknowledgement):
+                self.task_manager.task_start(message.task, message.worker)
+            elif isinstance(message, Result):
+                self.task_manager.task_done(message.task, message.result)
+            elif isinstance(message, Problem):
+                self.task_manager.task_problem(message.task, message.error)
+
+        return len(messages)
 
     def update_status(self):
         self.update_tasks()
@@ -216,6 +273,11 @@ class PoolManager:
 
     def update_tasks(self):
         """Handles timing out Tasks."""
+        # only acknowledged tasks can time out or be cancelled
+        if not (self.task_manager.timeout_heap or
+                self.task_manager.worker_tasks):
+            return
+
         for task in self.task_manager.timeout_tasks():
             self.task_manager.task_done(
                 task.id, TimeoutError("Task timeout", task.timeout))
@@ -245,14 +307,15 @@ class PoolManager:
             self.task_manager.task_done(task.id, error)
 
     def find_expired_task(self, worker_id):
-        tasks = tuple(self.task_manager.tasks.values())
-        running_tasks = tuple(t for t in tasks if t.worker_id != 0)
-
-        if running_tasks:
-            return task_worker_lookup(running_tasks, worker_id)
-        else:
+        if not self.task_manager.worker_tasks:
             raise BrokenProcessPool("All workers expired")
 
+        try:
+            task_id = self.task_manager.worker_tasks[worker_id]
+            return self.task_manager.tasks[task_id]
+        except KeyError:
+            raise LookupError("Not found")
+
 
 class TaskManager:
     """Manages the tasks flow within the Pool.
@@ -263,6 +326,8 @@ class TaskManager:
 
     def __init__(self, task_done_callback):
         self.tasks = {}
+        self.worker_tasks = {}
+        self.timeout_heap = []
         self.task_done_callback = task_done_callback
 
     def register(self, task):
@@ -270,9 +335,18 @@ class TaskManager:
 
     def task_start(self, task_id, worker_id):
         task = self.tasks[task_id]
+
+        if self.worker_tasks.get(task.worker_id) == task_id:
+            del self.worker_tasks[task.worker_id]  # task re-acknowledged
+
         task.worker_id = worker_id
-        task.timestamp = time.time()
+        task.timestamp = monotonic()
         task.set_running_or_notify_cancel()
+        if worker_id is not None:
+            self.worker_tasks[worker_id] = task_id
+        if task.timeout:
+            heapq.heappush(
+                self.timeout_heap, (task.timestamp + task.timeout, task_id))
 
     def task_done(self, task_id, result):
         """Set the tasks result and run the callback."""
@@ -281,6 +355,8 @@ class TaskManager:
         except KeyError:
             return  # result of previously timeout Task
         else:
+            if self.worker_tasks.get(task.worker_id) == task_id:
+                del self.worker_tasks[task.worker_id]
             if task.future.cancelled():
                 task.set_running_or_notify_cancel()
             elif isinstance(result, BaseException):
@@ -296,16 +372,33 @@ class TaskManager:
         self.task_done(task_id, error)
 
     def timeout_tasks(self):
-        return tuple(t for t in tuple(self.tasks.values()) if self.timeout(t))
+        timed_out = []
+        now = monotonic()
+
+        while self.timeout_heap and self.timeout_heap[0][0] < now:
+            _, task_id = heapq.heappop(self.timeout_heap)
+            task = self.tasks.get(task_id)
+
+            if task is not None and self.timeout(task, now):
+                timed_out.append(task)
+
+        return timed_out
 
     def cancelled_tasks(self):
-        return tuple(t for t in tuple(self.tasks.values())
-                     if t.timestamp != 0 and t.future.cancelled())
+        cancelled = []
+
+        for task_id in tuple(self.worker_tasks.values()):
+            task = self.tasks.get(task_id)
+
+            if task is not None and task.future.cancelled():
+                cancelled.append(task)
+
+        return cancelled
 
     @staticmethod
-    def timeout(task):
+    def timeout(task, now):
         if task.timeout and task.started:
-            return time.time() - task.timestamp > task.timeout
+            return now - task.timestamp > task.timeout
         else:
             return False
 
@@ -320,38 +413,78 @@ class WorkerManager:
         self.workers = {}
         self.workers_number = workers
         self.worker_parameters = worker_parameters
+        self.reap_queue = Queue()
+        self.function_cache = {}
         self.pool_channel, self.workers_channel = channels()
 
     def dispatch(self, task):
+        payload = task.payload
+
         try:
-            self.pool_channel.send(WorkerTask(task.id, task.payload))
+            self.pool_channel.send(
+                WorkerTask(task.id, TaskPayload(
+                    self.dump_function(payload.function),
+                    payload.args, payload.kwargs)))
         except (pickle.PicklingError, TypeError) as error:
             raise error
         except (OSError, EnvironmentError) as error:
             raise BrokenProcessPool(error)
 
+    def dump_function(self, function):
+        """Serializes the function memoizing repeated submissions.
+
+        Only callables pickled by reference are cached: methods, partials
+        and callable objects embed their state in the payload, caching
+        them would dispatch stale state on resubmission after mutation.
+
+        """
+        if not isinstance(function, CACHEABLE_FUNCTIONS):
+            return dump_object(function)
+
+        try:
+            return self.function_cache[function]
+        except KeyError:
+            data = dump_object(function)
+
+            if len(self.function_cache) >= FUNCTION_CACHE_SIZE:
+                self.function_cache.clear()
+            self.function_cache[function] = data
+
+            return data
+
     def receive(self, timeout):
+        """Returns all messages ready on the channel.
+
+        Waits at most *timeout* for the first message to arrive.
+
+        """
+        messages = []
+
         try:
-            if self.pool_channel.poll(timeout):
-                return self.pool_channel.recv()
-            else:
-                return NoMessage()
+            while self.pool_channel.poll(timeout):
+                messages.append(decode_message(self.pool_channel.recv_bytes()))
+                timeout = 0
         except (OSError, EnvironmentError) as error:
             raise BrokenProcessPool(error)
 
+        return messages
+
     def inspect_workers(self):
         """Updates the workers status.
 
         Returns the workers which have unexpectedly ended.
 
         """
-        workers = tuple(self.workers.values())
-        expired = tuple(w for w in workers if not w.is_alive())
+        expired = []
+
+        for worker_id, worker in list(self.workers.items()):
+            if not worker.is_alive():
+                del self.workers[worker_id]
 
-        for worker in expired:
-            self.workers.pop(worker.pid)
+                if worker.exitcode != 0:
+                    expired.append((worker_id, worker.exitcode))
 
-        return ((w.pid, w.exitcode) for w in expired if w.exitcode != 0)
+        return expired
 
     def create_workers(self):
         for _ in range(self.workers_number - len(self.workers)):
@@ -362,7 +495,13 @@ class WorkerManager:
         self.workers_channel.close()
 
     def stop_workers(self):
-        for worker_id in tuple(self.workers.keys()):
+        try:  # workers enqueued for reaping but not yet terminated
+            while True:
+                stop_process(self.reap_queue.get_nowait())
+        except Empty:
+            pass
+
+        for worker_id in list(self.workers.keys()):
             self.stop_worker(worker_id, force=True)
 
     def new_worker(self):
@@ -378,13 +517,25 @@ class WorkerManager:
             if force:
                 stop_process(self.workers.pop(worker_id))
             else:
-                with self.workers_channel.lock:
-                    stop_process(self.workers.pop(worker_id))
-        except ChannelError as error:
-            raise BrokenProcessPool(error)
+                # termination is delegated to the reaper loop so the
+                # pool manager does not block on a dying worker
+                self.reap_queue.put(self.workers.pop(worker_id))
         except KeyError:
             return  # worker already expired
 
+    def reap_worker(self, timeout):
+        """Terminates the next worker scheduled for removal."""
+        try:
+            worker = self.reap_queue.get(timeout=timeout)
+        except Empty:
+            return
+
+        try:
+            with self.workers_channel.lock:
+                stop_process(worker)
+        except ChannelError as error:
+            raise BrokenProcessPool(error)
+
 
 def worker_process(params, channel):
     """The worker process routines."""
@@ -394,33 +545,99 @@ def worker_process(params, channel):
         if not run_initializer(params.initializer, params.initargs):
             os._exit(1)
 
+    # local bindings spare a global lookup per task in the hot loop
+    execute = process_execute
+    deliver = send_result
+    lookup = lookup_function
+
     try:
         for task in worker_get_next_task(channel, params.max_tasks):
             payload = task.payload
-            result = process_execute(
-                payload.function, *payload.args, **payload.kwargs)
-            send_result(channel, Result(task.id, result))
+            result = execute(
+                lookup(payload.function), *payload.args, **payload.kwargs)
+            deliver(channel, Result(task.id, result))
     except (EnvironmentError, OSError, RuntimeError) as error:
         os._exit(error.errno if error.errno else 1)
     except EOFError:
         os._exit(0)
 
 
-def worker_get_next_task(channel, max_tasks):
-    counter = count()
+def lookup_function(data):
+    """Deserializes the function memoizing repeated submissions.
+
+    Only callables pickled by reference are cached: re-using the
+    deserialized object is safe as the payload is just a qualified
+    name. Callables pickled by value must be rebuilt per task or
+    state mutated by one execution would leak into the next.
 
-    while max_tasks == 0 or next(counter) < max_tasks:
-        yield fetch_task(channel)
+    """
+    try:
+        return FUNCTION_CACHE[data]
+    except KeyError:
+        function = pickle.loads(data)
+
+        if isinstance(function, CACHEABLE_FUNCTIONS):
+            if len(FUNCTION_CACHE) >= FUNCTION_CACHE_SIZE:
+                FUNCTION_CACHE.clear()
+            FUNCTION_CACHE[data] = function
+
+        return function
+
+
+def worker_get_next_task(channel, max_tasks):
+    if max_tasks:
+        for _ in range(max_tasks):
+            yield fetch_task(channel)
+    else:
+        while True:
+            yield fetch_task(channel)
 
 
 def send_result(pipe, result):
     """Send result handling pickling and communication errors."""
+    result = encode_result(result)
+
     try:
         pipe.send(result)
     except (pickle.PicklingError, TypeError) as error:
         pipe.send(Problem(result.task, error))
 
 
+def encode_result(result):
+    """Moves large binary results into shared memory
+    keeping the channel message small."""
+    if (SharedMemory is None or not isinstance(result.result, bytes)
+            or len(result.result) < SHARED_MEMORY_MIN_SIZE):
+        return result
+
+    size = len(result.result)
+
+    try:
+        memory = SharedMemory(create=True, size=size)
+    except (OSError, EnvironmentError):
+        return result  # no shared memory available, fall back to pickle
+
+    memory.buf[:size] = result.result
+    memory.close()
+
+    if os.name != 'nt':
+        # ownership moves to the pool which unlinks the block once read
+        unregister(memory._name, 'shared_memory')
+
+    return Result(result.task, SharedResult(memory.name, size))
+
+
+def decode_shared_result(shared):
+    """Reads and releases a result passed through shared memory."""
+    memory = SharedMemory(name=shared.name)
+
+    try:
+        return bytes(memory.buf[:shared.size])
+    finally:
+        memory.close()
+        memory.unlink()
+
+
 def fetch_task(channel):
     while channel.poll():
         try:
@@ -431,22 +648,41 @@ def fetch_task(channel):
 
 def task_transaction(channel):
     """Ensures a task is fetched and acknowledged atomically."""
-    with channel.lock:
+    with channel.mutex.reader:
         if channel.poll(0):
             task = channel.recv()
-            channel.send(Acknowledgement(os.getpid(), task.id))
+            # One Acknowledgement per task is mandatory: timeout and
+            # cancellation handling as well as expired worker attribution
+            # rely on the pool knowing which worker picked up which task.
+            # Sending it under the reader mutex keeps fetch and ack atomic
+            # with respect to worker termination: stop_worker acquires the
+            # whole channel lock, so it cannot kill a worker owning an
+            # unacknowledged task. Nesting reader then writer follows the
+            # ChannelMutex.acquire order.
+            channel.send_bytes(ACK_HEADER.pack(ACK_TAG, os.getpid(), task.id))
         else:
             raise RuntimeError("Race condition between workers")
 
     return task
 
 
-def task_worker_lookup(running_tasks, worker_id):
-    for task in running_tasks:
-        if task.worker_id == worker_id:
-            return task
+def decode_message(data):
+    """Decodes a message coming from the workers channel.
+
+    Acknowledgements travel as fixed-size binary frames,
+    everything else is pickled.
+
+    """
+    if len(data) == ACK_HEADER.size and data[0:1] == ACK_TAG_BYTE:
+        _, worker_id, task_id = ACK_HEADER.unpack(data)
+        return Acknowledgement(worker_id, task_id)
+
+    message = pickle.loads(data)
+
+    if isinstance(message, Result) and isinstance(message.result, SharedResult):
+        return Result(message.task, decode_shared_result(message.result))
 
-    raise LookupError("Not found")
+    return message
 
 
 def process_chunk(function, chunk):
@@ -454,8 +690,28 @@ def process_chunk(function, chunk):
     return [process_execute(function, *args) for args in chunk]
 
 
-NoMessage = namedtuple('NoMessage', ())
 Result = namedtuple('Result', ('task', 'result'))
 Problem = namedtuple('Problem', ('task', 'error'))
 WorkerTask = namedtuple('WorkerTask', ('id', 'payload'))
 Acknowledgement = namedtuple('Acknowledgement', ('worker', 'task'))
+SharedResult = namedtuple('SharedResult', ('name', 'size'))
+
+# Binary results smaller than this are cheaper to pickle down the pipe
+# than to round-trip through a shared memory block.
+SHARED_MEMORY_MIN_SIZE = 2 ** 20
+
+# Serialized functions are memoized on both channel ends:
+# the pool caches per function object, the workers per payload.
+# Only callables serialized as a qualified name may be cached pool-side.
+CACHEABLE_FUNCTIONS = (types.FunctionType, types.BuiltinFunctionType, type)
+FUNCTION_CACHE = {}
+FUNCTION_CACHE_SIZE = 32
+
+# Idle pools progressively stretch the manager tick up to this limit.
+MAX_SLEEP_UNIT = 8 * SLEEP_UNIT
+
+# Acknowledgements are pure control-plane traffic: a tag byte,
+# the worker PID and the task ID packed in a fixed-size frame.
+ACK_TAG = 1
+ACK_TAG_BYTE = b'\x01'
+ACK_HEADER = struct.Struct('!BQQ')
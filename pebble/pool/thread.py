@@ -17,6 +17,11 @@
 
 import time
 from itertools import count
+
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic  # Python 2
 from multiprocessing import cpu_count
 from concurrent.futures import Future
 
@@ -127,7 +132,7 @@ class PoolManager:
     def stop(self):
         for worker in self.workers:
             self.context.task_queue.put(None)
-        for worker in tuple(self.workers):
+        for worker in list(self.workers):
             self.join_worker(worker)
 
     def update_status(self):
@@ -139,7 +144,7 @@ class PoolManager:
         self.create_workers()
 
     def inspect_workers(self):
-        return tuple(w for w in self.workers if not w.is_alive())
+        return [w for w in self.workers if not w.is_alive()]
 
     def create_workers(self):
         for _ in range(self.context.workers - len(self.workers)):
@@ -162,29 +167,32 @@ def worker_thread(context):
             context.state = ERROR
             return
 
+    task_done = queue.task_done
+
     for task in get_next_task(context, parameters.max_tasks):
         execute_next_task(task)
-        queue.task_done()
+        task_done()
 
 
 def get_next_task(context, max_tasks):
     counter = count()
-    queue = context.task_queue
+    get_task = context.task_queue.get
+    task_done = context.task_queue.task_done
 
     while context.alive and (max_tasks == 0 or next(counter) < max_tasks):
-        task = queue.get()
+        task = get_task()
 
         if task is not None:
             if task.future.cancelled():
                 task.set_running_or_notify_cancel()
-                queue.task_done()
+                task_done()
             else:
                 yield task
 
 
 def execute_next_task(task):
     payload = task.payload
-    task.timestamp = time.time()
+    task.timestamp = monotonic()
     task.set_running_or_notify_cancel()
 
     result = execute(payload.function, *payload.args, **payload.kwargs)
@@ -68,6 +68,19 @@ def long_function(value=1):
     return value
 
 
+def binary_function(size):
+    return b"a" * size
+
+
+class CounterCallable:
+    def __init__(self):
+        self.counter = 0
+
+    def __call__(self):
+        self.counter += 1
+        return self.counter
+
+
 def pid_function():
     time.sleep(0.1)
     return os.getpid()
@@ -305,6 +318,26 @@ class TestProcessPool(unittest.TestCase):
 
         self.assertEqual(data, future.result())
 
+    def test_process_pool_large_binary_result(self):
+        """Process Pool Forkserver large binary results are returned."""
+        size = 4 * 1024 * 1024  # over the shared memory threshold
+
+        with ProcessPool(max_workers=1) as pool:
+            future = pool.schedule(binary_function, args=[size])
+
+        self.assertEqual(b"a" * size, future.result())
+
+    def test_process_pool_callable_objects(self):
+        """Process Pool Forkserver callable objects do not share state across tasks."""
+        task = CounterCallable()
+
+        with ProcessPool(max_workers=1) as pool:
+            future1 = pool.schedule(task)
+            future2 = pool.schedule(task)
+
+        self.assertEqual(future1.result(), 1)
+        self.assertEqual(future2.result(), 1)
+
     def test_process_pool_stop_large_data(self):
         """Process Pool Forkserver is stopped if large data is sent on the channel."""
         data = "a" * 1098 * 1024 * 50  # 50 Mb